@@ -5,9 +5,12 @@ Streamlit application for AI-powered workers' compensation assistance
 """
 
 import streamlit as st
-import json
+import asyncio
+import re
+import uuid
 from typing import Any
 import time
+import numpy as np
 
 # Import our modules
 from config import Config
@@ -24,7 +27,7 @@ st.set_page_config(
 )
 
 # Custom CSS for modern UI
-st.markdown("""
+_CSS_HTML = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -73,44 +76,102 @@ st.markdown("""
         background-color: #1565c0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def _inject_css():
+    """Emit the custom CSS once; cached so reruns replay it without re-sending"""
+    st.markdown(_CSS_HTML, unsafe_allow_html=True)
 
 @st.cache_resource
 def initialize_services():
     """Initialize and cache services"""
     try:
         Config.validate()
-        return {
+        services = {
             'supabase': SupabaseClient(),
             'embedding': EmbeddingService(),
             'llm': LLMService()
         }
+
+        # One-shot warm-up so the first real question doesn't pay the cold
+        # connection/model-init cost in the UI thread
+        try:
+            services['embedding'].get_embedding("warmup")
+        except Exception:
+            pass
+
+        return services
     except Exception as e:
         st.error(f"Configuration error: {str(e)}")
         return None
 
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_documents_with_counts(_services: dict[str, Any]) -> list[dict[str, Any]]:
+    """Get (and briefly cache) the document list with chunk counts"""
+    return _services['supabase'].get_all_documents_with_counts()
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt for cache lookups (lowercase, collapsed whitespace)"""
+    return re.sub(r'\s+', ' ', prompt.strip().lower())
+
+@st.cache_data(ttl=3600, max_entries=1024, show_spinner=False)
+def cached_embedding(prompt_norm: str, _services: dict[str, Any]) -> tuple[float, ...]:
+    """Get (and cache) the embedding for a normalized prompt"""
+    return tuple(_services['embedding'].get_embedding(prompt_norm))
+
+@st.cache_data(ttl=300, max_entries=512, show_spinner=False)
+def cached_search(emb_key: bytes, _services: dict[str, Any]) -> list[dict[str, Any]]:
+    """Search for similar chunks, cached on a compact hash key of the embedding"""
+    query_embedding = np.frombuffer(emb_key, dtype=np.float16).astype(float).tolist()
+    return _services['supabase'].search_similar_chunks(query_embedding)
+
+async def retrieve_context(services: dict[str, Any], prompt: str) -> tuple[list[float], list[dict[str, Any]]]:
+    """Embed the question and fetch similar chunks, overlapping I/O where possible"""
+    # Warm up the Supabase connection while the embedding lookup is in flight
+    question_embedding, _ = await asyncio.gather(
+        asyncio.to_thread(cached_embedding, normalize_prompt(prompt), services),
+        services['supabase'].awarm_up()
+    )
+    # Key the search cache on fp16 bytes (3 KB) rather than a 1536-float tuple
+    emb_key = np.asarray(question_embedding, dtype=np.float16).tobytes()
+    similar_chunks = await asyncio.to_thread(cached_search, emb_key, services)
+    return list(question_embedding), similar_chunks
+
 def format_sources(chunks: list[dict[str, Any]]) -> str:
     """Format source citations for display"""
-    sources = []
-    for i, chunk in enumerate(chunks, 1):
-        metadata = chunk.get("metadata", {})
-        if isinstance(metadata, str):
-            try:
-                metadata = json.loads(metadata)
-            except:
-                metadata = {}
-        
-        filename = metadata.get("filename", "Unknown")
-        title = metadata.get("title", filename)
-        similarity = chunk.get("similarity", 0)
-        
-        sources.append(f"[{i}] {title} ({filename}) - Similarity: {similarity:.2f}")
-    
-    return "\n".join(sources)
+    # filename/title are projected by the match_documents RPC, so no JSON parsing here
+    return "\n".join(
+        f"[{i}] {chunk.get('title') or 'Unknown'} ({chunk.get('filename') or 'Unknown'}) - Similarity: {chunk.get('similarity', 0):.2f}"
+        for i, chunk in enumerate(chunks, 1)
+    )
+
+def add_message(role: str, content: str, **extra: Any) -> None:
+    """Append a chat message with a stable id to the session history"""
+    st.session_state.messages.append({"id": uuid.uuid4().hex, "role": role, "content": content, **extra})
+
+@st.fragment
+def render_history():
+    """Render the chat history in an isolated fragment
+
+    Keyed as a fragment so interactions elsewhere in the page don't re-run
+    the O(history) markdown parse on every rerun.
+    """
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+            # Show sources for assistant messages
+            if message["role"] == "assistant" and "sources" in message:
+                with st.expander("📚 View Sources"):
+                    st.text(message["sources"])
 
 def main():
     """Main application function"""
-    
+
+    # Inject custom CSS (cached across reruns)
+    _inject_css()
+
     # Header
     st.markdown('<h1 class="main-header">🏥 Chatty</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Your AI Assistant for Australian Workers\' Compensation</p>', unsafe_allow_html=True)
@@ -127,25 +188,27 @@ def main():
         st.write(f"Model: {Config.LLM_MODEL}")
         st.write(f"Temperature: {Config.TEMPERATURE}")
         st.write(f"Max Results: {Config.TOP_K_RESULTS}")
+
+        st.header("📚 Knowledge Base")
+        try:
+            # Single aggregate query instead of one chunk-count call per document
+            for doc in cached_documents_with_counts(services):
+                st.write(f"**{doc.get('title') or doc['filename']}**")
+                st.caption(f"Chunks: {doc['chunk_count']} | Size: {doc['file_size']:,} bytes")
+        except Exception as e:
+            st.caption(f"Could not load documents: {str(e)}")
     
     # Initialize chat history
     if "messages" not in st.session_state:
         st.session_state.messages = []
     
     # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-            
-            # Show sources for assistant messages
-            if message["role"] == "assistant" and "sources" in message:
-                with st.expander("📚 View Sources"):
-                    st.text(message["sources"])
-    
+    render_history()
+
     # Chat input
     if prompt := st.chat_input("Ask me about workers' compensation..."):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        add_message("user", prompt)
         
         # Display user message
         with st.chat_message("user"):
@@ -158,32 +221,23 @@ def main():
             try:
                 # Show thinking indicator
                 with st.spinner("🔍 Searching knowledge base..."):
-                    # Get embedding for the question
-                    question_embedding = services['embedding'].get_embedding(prompt)
-                    
-                    # Search for similar chunks
-                    similar_chunks = services['supabase'].search_similar_chunks(question_embedding)
+                    # Embed the question and search for similar chunks concurrently
+                    question_embedding, similar_chunks = asyncio.run(retrieve_context(services, prompt))
                 
                 if not similar_chunks:
                     response = "I don't have enough information in my knowledge base to answer your question accurately."
                     sources = "No relevant sources found."
+                    message_placeholder.markdown(response)
                 else:
-                    with st.spinner("🤖 Generating response..."):
-                        # Generate response using LLM
-                        response = services['llm'].generate_response(prompt, similar_chunks)
-                    
+                    # Stream the response so the first token renders while
+                    # generation continues; returns the concatenated string
+                    response = st.write_stream(services['llm'].stream_response(prompt, similar_chunks))
+
                     # Format sources
                     sources = format_sources(similar_chunks)
                 
-                # Display response
-                message_placeholder.markdown(response)
-                
                 # Add assistant message to chat history
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": response,
-                    "sources": sources
-                })
+                add_message("assistant", response, sources=sources)
                 
                 # Show sources in expander
                 if similar_chunks:
@@ -193,10 +247,7 @@ def main():
             except Exception as e:
                 error_message = f"Sorry, I encountered an error: {str(e)}"
                 message_placeholder.error(error_message)
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": error_message
-                })
+                add_message("assistant", error_message)
     
     # Clear chat button
     if st.session_state.messages and st.button("🗑️ Clear Chat"):
@@ -1,8 +1,15 @@
+import functools
 import os
+from typing import Final
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv(override=True)
+@functools.cache
+def _load_env() -> None:
+    """Parse .env exactly once per process, no matter how often callers ask"""
+    load_dotenv(override=True)
+
+# Load environment variables (memoized; reruns and re-imports skip the file I/O)
+_load_env()
 
 class Config:
     """Configuration class for Chatty chatbot"""
@@ -24,12 +31,14 @@ class Config:
     
     # Vector Search Configuration
     TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
+    MATCH_THRESHOLD = float(os.getenv("MATCH_THRESHOLD", "0.78"))
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "800"))
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
     
     @classmethod
     def validate(cls):
         """Validate that all required environment variables are set"""
+        _load_env()
         required_vars = [
             "OPENAI_API_KEY",
             "OPENROUTER_API_KEY", 
@@ -44,5 +53,17 @@ class Config:
         
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
-        
-        return True 
\ No newline at end of file
+
+        return True
+
+# Module-level constants specialized from Config at import time. Hot paths
+# bind these as function defaults so per-call attribute lookups (and the
+# "if x is None" dance) disappear.
+EMBEDDING_MODEL: Final[str] = Config.EMBEDDING_MODEL
+LLM_MODEL: Final[str] = Config.LLM_MODEL
+TEMPERATURE: Final[float] = Config.TEMPERATURE
+MAX_TOKENS: Final[int] = Config.MAX_TOKENS
+TOP_K_RESULTS: Final[int] = Config.TOP_K_RESULTS
+MATCH_THRESHOLD: Final[float] = Config.MATCH_THRESHOLD
+CHUNK_SIZE: Final[int] = Config.CHUNK_SIZE
+CHUNK_OVERLAP: Final[int] = Config.CHUNK_OVERLAP 
\ No newline at end of file
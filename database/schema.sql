@@ -19,13 +19,20 @@ CREATE TABLE IF NOT EXISTS chat_bot_document_chunks (
     chunk_index INTEGER NOT NULL,
     content TEXT NOT NULL,
     metadata JSONB DEFAULT '{}',
-    embedding VECTOR(1536), -- OpenAI text-embedding-ada-002 produces 1536-dimensional vectors
+    -- OpenAI text-embedding-ada-002 produces 1536-dimensional vectors.
+    -- Stored as half precision (pgvector >= 0.7) to halve storage and scan bandwidth;
+    -- existing deployments migrate with:
+    --   ALTER TABLE chat_bot_document_chunks ALTER COLUMN embedding TYPE HALFVEC(1536);
+    embedding HALFVEC(1536),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_chat_bot_document_chunks_document_id ON chat_bot_document_chunks(document_id);
-CREATE INDEX IF NOT EXISTS idx_chat_bot_document_chunks_embedding ON chat_bot_document_chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- Embeddings are unit-normalized at ingest (see EmbeddingService._normalize),
+-- so inner product equals cosine similarity and skips the per-comparison
+-- normalization that cosine ops pay.
+CREATE INDEX IF NOT EXISTS idx_chat_bot_document_chunks_embedding ON chat_bot_document_chunks USING hnsw (embedding halfvec_ip_ops) WITH (m = 16, ef_construction = 64);
 
 -- Create a function to update the updated_at timestamp
 CREATE OR REPLACE FUNCTION chat_bot_update_updated_at_column()
@@ -40,30 +47,81 @@ $$ language 'plpgsql';
 CREATE TRIGGER chat_bot_update_documents_updated_at BEFORE UPDATE ON chat_bot_documents
     FOR EACH ROW EXECUTE FUNCTION chat_bot_update_updated_at_column();
 
--- Create a function to search for similar chunks
+-- Create a function to list documents with their chunk counts in one query
+CREATE OR REPLACE FUNCTION chat_bot_documents_with_counts()
+RETURNS TABLE (
+    id UUID,
+    filename TEXT,
+    title TEXT,
+    content_type TEXT,
+    file_size INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE,
+    chunk_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        d.id,
+        d.filename,
+        d.title,
+        d.content_type,
+        d.file_size,
+        d.created_at,
+        COALESCE(c.n, 0) AS chunk_count
+    FROM chat_bot_documents d
+    LEFT JOIN (
+        SELECT document_id, COUNT(*) AS n
+        FROM chat_bot_document_chunks
+        GROUP BY document_id
+    ) c ON c.document_id = d.id
+    ORDER BY d.created_at DESC;
+$$;
+
+-- Create a function to search for similar chunks.
+-- The argument types changed (VECTOR -> HALFVEC, threshold moved behind a
+-- default), so on an existing deployment CREATE OR REPLACE would add a second
+-- overload instead of replacing the old one and PostgREST RPC calls by name
+-- would fail as ambiguous. Drop the stale signatures first.
+DROP FUNCTION IF EXISTS chat_bot_match_documents(VECTOR(1536), FLOAT, INT);
+DROP FUNCTION IF EXISTS chat_bot_match_documents(HALFVEC(1536), FLOAT, INT);
 CREATE OR REPLACE FUNCTION chat_bot_match_documents(
-    query_embedding VECTOR(1536),
-    match_threshold FLOAT DEFAULT 0.78,
-    match_count INT DEFAULT 5
+    query_embedding HALFVEC(1536),
+    match_count INT DEFAULT 5,
+    match_threshold FLOAT DEFAULT 0.78
 )
 RETURNS TABLE (
     id UUID,
     content TEXT,
     metadata JSONB,
+    filename TEXT,
+    title TEXT,
     similarity FLOAT
 )
 LANGUAGE plpgsql
 AS $$
 BEGIN
+    SET LOCAL hnsw.ef_search = 40;
+    -- Order-by-distance + LIMIT first so the HNSW index is used; a WHERE clause
+    -- on the computed similarity would force a brute-force scan.
     RETURN QUERY
-    SELECT
-        dc.id,
-        dc.content,
-        dc.metadata,
-        1 - (dc.embedding <=> query_embedding) AS similarity
-    FROM chat_bot_document_chunks dc
-    WHERE 1 - (dc.embedding <=> query_embedding) > match_threshold
-    ORDER BY dc.embedding <=> query_embedding
-    LIMIT match_count;
+    SELECT * FROM (
+        SELECT
+            dc.id,
+            dc.content,
+            dc.metadata,
+            dc.metadata->>'filename' AS filename,
+            COALESCE(dc.metadata->>'title', dc.metadata->>'filename') AS title,
+            -- <#> is negative inner product; with unit vectors its negation
+            -- is exactly the cosine similarity
+            -(dc.embedding <#> query_embedding) AS similarity
+        FROM chat_bot_document_chunks dc
+        ORDER BY dc.embedding <#> query_embedding
+        LIMIT match_count
+    ) best
+    WHERE best.similarity > match_threshold;
 END;
-$$; 
\ No newline at end of file
+$$;
+
+-- After bulk ingestion (document_uploader), run ANALYZE so the planner has
+-- fresh statistics for the chunks table:
+--   ANALYZE chat_bot_document_chunks; 
\ No newline at end of file
@@ -1,14 +1,38 @@
-import json
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
-from supabase import create_client, Client
-from config import Config
+import httpx
+import numpy as np
+import orjson
+from supabase import create_client, Client, ClientOptions, PostgrestAPIError
+from config import Config, MATCH_THRESHOLD, TOP_K_RESULTS
 
 class SupabaseClient:
     """Client for interacting with Supabase database"""
-    
+
+    # Rows per insert request; keeps each POST body a sane size for PostgREST
+    INSERT_BATCH_SIZE = 200
+    INSERT_MAX_WORKERS = 8
+
+    # Keep in sync with the chat_bot_match_documents DEFAULT in schema.sql
+    DEFAULT_MATCH_THRESHOLD = 0.78
+
     def __init__(self):
         """Initialize Supabase client"""
-        self.client: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+        # Shared keep-alive pool with HTTP/2 so repeated calls skip TCP/TLS
+        # setup and can multiplex on one connection
+        self._http = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60),
+            timeout=10.0
+        )
+        self.client: Client = create_client(
+            Config.SUPABASE_URL,
+            Config.SUPABASE_KEY,
+            options=ClientOptions(httpx_client=self._http)
+        )
     
     def insert_document(self, filename: str, title: str, content_type: str, file_size: int) -> str:
         """Insert a new document and return its ID"""
@@ -22,38 +46,127 @@ class SupabaseClient:
         result = self.client.table("chat_bot_documents").insert(data).execute()
         return result.data[0]["id"]
     
-    def insert_chunks(self, document_id: str, chunks: List[Dict[str, Any]]) -> None:
-        """Insert document chunks with embeddings"""
+    @staticmethod
+    def _has_direct_connection() -> bool:
+        """Check whether direct Postgres credentials are configured (see main.py)"""
+        return bool(os.getenv("host") and os.getenv("dbname") and os.getenv("user"))
+
+    @staticmethod
+    def _copy_escape(value: str) -> str:
+        """Escape a value for the COPY text format"""
+        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+    def _insert_chunks_copy(self, document_id: str, texts: List[str], metadatas: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
+        """Bulk-insert chunks over a direct Postgres COPY stream"""
+        import psycopg2
+
+        embeddings_fp16 = np.asarray(embeddings, dtype=np.float16)
+        buffer = io.StringIO()
+        for i, text in enumerate(texts):
+            embedding_literal = "[" + ",".join(str(x) for x in embeddings_fp16[i].astype(float).tolist()) + "]"
+            buffer.write("\t".join([
+                document_id,
+                str(i),
+                self._copy_escape(text),
+                self._copy_escape(orjson.dumps(metadatas[i]).decode()),
+                embedding_literal
+            ]) + "\n")
+        buffer.seek(0)
+
+        connection = psycopg2.connect(
+            user=os.getenv("user"),
+            password=os.getenv("password"),
+            host=os.getenv("host"),
+            port=os.getenv("port"),
+            dbname=os.getenv("dbname")
+        )
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    "COPY chat_bot_document_chunks (document_id, chunk_index, content, metadata, embedding) FROM STDIN",
+                    buffer
+                )
+            connection.commit()
+        finally:
+            connection.close()
+
+    def insert_chunks(self, document_id: str, texts: List[str], metadatas: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
+        """Insert document chunks from parallel arrays (see EmbeddingService.embed_chunks)"""
+        # Prefer a direct COPY stream over the JSON REST API when direct
+        # Postgres credentials are configured - no per-row JSON encoding and
+        # far smaller payloads
+        if self._has_direct_connection():
+            self._insert_chunks_copy(document_id, texts, metadatas, embeddings)
+            return
+
+        # Round to half precision once for the whole matrix (matches halfvec)
+        embeddings_fp16 = np.asarray(embeddings, dtype=np.float16)
         chunk_data = []
-        
-        for i, chunk in enumerate(chunks):
+
+        for i, text in enumerate(texts):
             chunk_data.append({
                 "document_id": document_id,
                 "chunk_index": i,
-                "content": chunk["content"],
-                "metadata": json.dumps(chunk["metadata"]),
-                "embedding": chunk["embedding"]
+                "content": text,
+                "metadata": orjson.dumps(metadatas[i]).decode(),
+                "embedding": embeddings_fp16[i].tolist()
             })
-        
-        self.client.table("chat_bot_document_chunks").insert(chunk_data).execute()
+
+        # Insert in size-bounded batches, dispatched concurrently, instead of
+        # one oversized POST that PostgREST has to parse in a single pass
+        batches = [
+            chunk_data[i:i + self.INSERT_BATCH_SIZE]
+            for i in range(0, len(chunk_data), self.INSERT_BATCH_SIZE)
+        ]
+
+        if len(batches) == 1:
+            self.client.table("chat_bot_document_chunks").insert(batches[0]).execute()
+            return
+
+        with ThreadPoolExecutor(max_workers=self.INSERT_MAX_WORKERS) as executor:
+            futures = [
+                executor.submit(
+                    lambda batch: self.client.table("chat_bot_document_chunks").insert(batch).execute(),
+                    batch
+                )
+                for batch in batches
+            ]
+            for future in futures:
+                future.result()
     
-    def search_similar_chunks(self, query_embedding: List[float], top_k: int = None) -> List[Dict[str, Any]]:
+    def search_similar_chunks(self, query_embedding: List[float], top_k: int = TOP_K_RESULTS) -> List[Dict[str, Any]]:
         """Search for similar chunks using vector similarity"""
-        if top_k is None:
-            top_k = Config.TOP_K_RESULTS
-        
-        # Call the match_documents function
-        result = self.client.rpc(
-            "chat_bot_match_documents",
-            {
-                "query_embedding": query_embedding,
-                "match_threshold": 0.78,
-                "match_count": top_k
-            }
-        ).execute()
+        # Call the match_documents function; match_threshold defaults
+        # server-side, so the payload only carries an operator override
+        params = {
+            "query_embedding": np.asarray(query_embedding, dtype=np.float16).tolist(),
+            "match_count": top_k
+        }
+        if MATCH_THRESHOLD != self.DEFAULT_MATCH_THRESHOLD:
+            params["match_threshold"] = MATCH_THRESHOLD
+
+        result = self.client.rpc("chat_bot_match_documents", params).execute()
         
         return result.data
-    
+
+    async def asearch_similar_chunks(self, query_embedding: List[float], top_k: int = TOP_K_RESULTS) -> List[Dict[str, Any]]:
+        """Async variant of search_similar_chunks (runs the sync client off the event loop)"""
+        return await asyncio.to_thread(self.search_similar_chunks, query_embedding, top_k)
+
+    def warm_up(self) -> None:
+        """Open a connection with a cheap metadata-only request"""
+        try:
+            self.client.table("chat_bot_documents").select("id", count="estimated", head=True).execute()
+        except (httpx.HTTPError, PostgrestAPIError):
+            # Warm-up is best-effort: network/API failures here just mean the
+            # first real query pays the handshake. Anything else (e.g. a
+            # programming error) should surface, not be swallowed.
+            pass
+
+    async def awarm_up(self) -> None:
+        """Async variant of warm_up"""
+        await asyncio.to_thread(self.warm_up)
+
     def get_document_info(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get document information by ID"""
         result = self.client.table("chat_bot_documents").select("*").eq("id", document_id).execute()
@@ -66,12 +179,26 @@ class SupabaseClient:
         """Get all documents"""
         result = self.client.table("chat_bot_documents").select("*").order("created_at", desc=True).execute()
         return result.data
+
+    def get_all_documents_with_counts(self) -> List[Dict[str, Any]]:
+        """Get all documents with their chunk counts in a single query"""
+        result = self.client.rpc("chat_bot_documents_with_counts").execute()
+        return result.data
     
     def delete_document(self, document_id: str) -> None:
         """Delete a document and all its chunks (cascade)"""
         self.client.table("chat_bot_documents").delete().eq("id", document_id).execute()
     
     def get_chunk_count(self, document_id: str) -> int:
-        """Get the number of chunks for a document"""
-        result = self.client.table("chat_bot_document_chunks").select("id", count="exact").eq("document_id", document_id).execute()
+        """Get the (estimated) number of chunks for a document
+
+        Uses planner statistics instead of a full COUNT(*) scan; good enough
+        for display purposes. head=True skips fetching any row data.
+        """
+        result = self.client.table("chat_bot_document_chunks").select("id", count="estimated", head=True).eq("document_id", document_id).execute()
+        return result.count or 0
+
+    def get_chunk_count_exact(self, document_id: str) -> int:
+        """Get the exact number of chunks for a document (full COUNT(*) scan)"""
+        result = self.client.table("chat_bot_document_chunks").select("id", count="exact", head=True).eq("document_id", document_id).execute()
         return result.count or 0 
\ No newline at end of file
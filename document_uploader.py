@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Document uploader for Chatty
+Processes local documents and loads them into the Supabase knowledge base
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+from config import Config
+from database.supabase_client import SupabaseClient
+from utils.document_processor import DocumentProcessor
+from utils.embedding_service import EmbeddingService
+
+SUPPORTED_EXTENSIONS = {".pdf", ".md", ".markdown", ".txt"}
+
+async def _upload_documents(docs_dir: str):
+    """Process and upload every supported document in docs_dir"""
+    Config.validate()
+
+    processor = DocumentProcessor()
+    embedding_service = EmbeddingService()
+    supabase_client = SupabaseClient()
+
+    docs_path = Path(docs_dir)
+    if not docs_path.is_dir():
+        print(f"❌ Document folder not found: {docs_dir}")
+        return
+
+    paths = sorted(p for p in docs_path.iterdir() if p.suffix.lower() in SUPPORTED_EXTENSIONS)
+    if not paths:
+        print(f"ℹ️  No supported documents found in {docs_dir}")
+        return
+
+    for path in paths:
+        print(f"📄 Processing {path.name}...")
+        try:
+            doc_info = processor.process_document(str(path))
+
+            texts, metadatas, embeddings = await embedding_service.aembed_chunks(doc_info["chunks"])
+
+            document_id = supabase_client.insert_document(
+                doc_info["filename"],
+                doc_info["title"],
+                doc_info["content_type"],
+                doc_info["file_size"]
+            )
+            supabase_client.insert_chunks(document_id, texts, metadatas, embeddings)
+
+            print(f"✅ Uploaded {len(texts)} chunks for {path.name}")
+        except Exception as e:
+            print(f"❌ Failed to process {path.name}: {str(e)}")
+
+def upload_documents(docs_dir: str = "docs"):
+    """Run the uploader under a single event loop
+
+    One asyncio.run for the whole batch keeps EmbeddingService's persistent
+    AsyncClient bound to a live loop; a run() per document would leave its
+    keep-alive connections attached to a closed loop after the first file.
+    """
+    asyncio.run(_upload_documents(docs_dir))
+
+if __name__ == "__main__":
+    print("🏥 Chatty - Document Uploader")
+    print("=" * 40)
+    upload_documents(sys.argv[1] if len(sys.argv) > 1 else "docs")
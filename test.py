@@ -7,12 +7,12 @@ import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
-# Load environment variables
-load_dotenv(override=True)
-
 def test_supabase_connection():
     """Test connection to Supabase and count documents"""
     try:
+        # Load environment variables
+        load_dotenv(override=True)
+
         # Get Supabase credentials
         supabase_url = os.getenv("SUPABASE_URL")
         supabase_key = os.getenv("SUPABASE_KEY")
@@ -28,7 +28,7 @@ def test_supabase_connection():
         
         # Test connection by counting documents
         print("📊 Counting rows in chat_bot_documents table...")
-        result = supabase.table("chat_bot_documents").select("id", count="exact").execute()
+        result = supabase.table("chat_bot_documents").select("id", count="estimated", head=True).execute()
         
         document_count = result.count or 0
         print(f"✅ Connection successful!")
@@ -36,7 +36,7 @@ def test_supabase_connection():
         
         # Also count chunks
         print("📊 Counting rows in chat_bot_document_chunks table...")
-        chunks_result = supabase.table("chat_bot_document_chunks").select("id", count="exact").execute()
+        chunks_result = supabase.table("chat_bot_document_chunks").select("id", count="estimated", head=True).execute()
         
         chunks_count = chunks_result.count or 0
         print(f"📝 Found {chunks_count} chunks in chat_bot_document_chunks table")
@@ -0,0 +1,287 @@
+import os
+from functools import cached_property
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any
+import ahocorasick
+import fitz  # PyMuPDF
+import tiktoken
+from langchain_text_splitters import MarkdownHeaderTextSplitter, TokenTextSplitter
+from config import Config
+
+# Minimum page count before a process pool is worth the spawn overhead
+_PARALLEL_PDF_MIN_PAGES = 4
+
+# Shared encoder; built once per process instead of per splitter instance
+_ENC = tiktoken.get_encoding("cl100k_base")
+
+# Below this size single-threaded tokenization beats process-pool overhead
+_PARALLEL_TOKENIZE_MIN_CHARS = 200_000
+
+# Skip image handling in the content-stream walk; graphics-heavy pages are
+# mostly drawing operators that contribute no text
+_PDF_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Keyword sets for _extract_semantic_info; category order decides content_type
+# when several categories match
+_CONTENT_TYPE_KEYWORDS = [
+    ("claims", ["claim", "injury", "compensation", "benefits"]),
+    ("legal", ["law", "regulation", "policy", "rule"]),
+    ("procedural", ["process", "step", "procedure", "how to"]),
+    ("contact", ["contact", "phone", "email", "address"])
+]
+_TOPIC_KEYWORDS = [
+    "workers compensation", "workcover", "injury", "claim", "employer",
+    "employee", "insurance", "premium", "return to work", "rehabilitation",
+    "medical", "wages", "benefits", "dispute", "safework"
+]
+
+def _build_keyword_automaton():
+    """Build the single-pass multi-pattern matcher for _extract_semantic_info"""
+    tags = defaultdict(list)
+    for category, words in _CONTENT_TYPE_KEYWORDS:
+        for word in words:
+            tags[word].append(category)
+    for word in _TOPIC_KEYWORDS:
+        tags[word].append("topic")
+
+    automaton = ahocorasick.Automaton()
+    for word, categories in tags.items():
+        automaton.add_word(word, (word, tuple(categories)))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# Category precedence, flattened once so classification doesn't re-walk the
+# keyword table per chunk
+_CONTENT_TYPE_PRIORITY = tuple(category for category, _ in _CONTENT_TYPE_KEYWORDS)
+
+def _encode_piece(piece: str) -> List[int]:
+    """Worker: tokenize one paragraph block (get_encoding caches per process)"""
+    return tiktoken.get_encoding("cl100k_base").encode(piece)
+
+def _extract_page_text(args):
+    """Worker: re-open the document and extract one page (fitz docs aren't picklable)"""
+    file_path, page_index = args
+    doc = fitz.open(file_path)
+    try:
+        return doc.load_page(page_index).get_text("text", flags=_PDF_TEXT_FLAGS)
+    finally:
+        doc.close()
+
+class DocumentProcessor:
+    """Processor for extracting and chunking document content for ingestion
+
+    Construction is deliberately empty: splitter configuration lives in class
+    constants and each splitter builds lazily on first use, so code paths that
+    never touch markdown (or never split at all) pay nothing for them.
+    """
+
+    HEADERS_TO_SPLIT_ON = [
+        ("#", "header_1"),
+        ("##", "header_2"),
+        ("###", "header_3")
+    ]
+
+    @cached_property
+    def markdown_splitter(self):
+        return MarkdownHeaderTextSplitter(headers_to_split_on=self.HEADERS_TO_SPLIT_ON)
+
+    @cached_property
+    def token_splitter(self):
+        return TokenTextSplitter(
+            encoding_name="cl100k_base",
+            chunk_size=Config.CHUNK_SIZE,
+            chunk_overlap=Config.CHUNK_OVERLAP
+        )
+
+    @staticmethod
+    def _iter_page_text(file_path: str):
+        """Yield page texts one at a time so only one parsed page is live"""
+        doc = fitz.open(file_path)
+        try:
+            for i in range(doc.page_count):
+                yield doc.load_page(i).get_text("text", flags=_PDF_TEXT_FLAGS)
+        finally:
+            doc.close()
+
+    def extract_text_from_pdf(self, file_path: str) -> str:
+        """Extract text from a PDF file"""
+        try:
+            doc = fitz.open(file_path)
+            page_count = doc.page_count
+            doc.close()
+
+            if page_count < _PARALLEL_PDF_MIN_PAGES:
+                # Generator keeps peak memory at one page's content stream
+                # instead of holding every parsed page until the join
+                parts = self._iter_page_text(file_path)
+            else:
+                # Page extraction is CPU-bound with no shared state, so farm
+                # pages out across cores; workers re-open the file themselves
+                chunksize = max(1, page_count // (4 * (os.cpu_count() or 1)))
+                with ProcessPoolExecutor() as executor:
+                    parts = list(executor.map(
+                        _extract_page_text,
+                        [(file_path, i) for i in range(page_count)],
+                        chunksize=chunksize
+                    ))
+
+            return "\n".join(parts).strip()
+        except Exception as e:
+            raise Exception(f"Error extracting text from PDF: {str(e)}")
+
+    def process_document(self, file_path: str) -> Dict[str, Any]:
+        """Extract, chunk and annotate a document for ingestion"""
+        path = Path(file_path)
+        filename = path.name
+        title = path.stem.replace("_", " ").replace("-", " ").title()
+        suffix = path.suffix.lower()
+
+        if suffix == ".pdf":
+            content_type = "application/pdf"
+            text = self.extract_text_from_pdf(str(path))
+            chunks = self._chunk_general_semantic(text, filename, title, "pdf")
+        elif suffix in (".md", ".markdown"):
+            content_type = "text/markdown"
+            with open(path, "r", encoding="utf-8") as f:
+                raw_content = f.read()
+            chunks = self._chunk_markdown_semantic(raw_content, filename, title)
+        elif suffix == ".txt":
+            content_type = "text/plain"
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            chunks = self._chunk_general_semantic(text, filename, title, "text")
+        else:
+            raise Exception(f"Unsupported file type: {suffix}")
+
+        return {
+            "filename": filename,
+            "title": title,
+            "content_type": content_type,
+            "file_size": path.stat().st_size,
+            "chunks": chunks
+        }
+
+    def _chunk_markdown_semantic(self, content: str, filename: str, title: str) -> List[Dict[str, Any]]:
+        """Split markdown content along headers, then by tokens where needed"""
+        # CHUNK_SIZE is in tokens but page_content is measured in characters
+        # (~4 chars/token for English), so gate the tokenizer on the character
+        # equivalent; the old comparison re-split sections four times too small
+        approx_char_limit = Config.CHUNK_SIZE * 4
+
+        # First pass gathers the pieces so total_chunks is known before any
+        # metadata dict exists; the old version rewrote every dict afterwards
+        pieces = []
+        for split in self.markdown_splitter.split_text(content):
+            if len(split.page_content) > approx_char_limit:
+                sub_chunks = self.token_splitter.split_text(split.page_content)
+            else:
+                sub_chunks = [split.page_content]
+            pieces.extend(
+                (sub_chunk, split.metadata, j, len(sub_chunks))
+                for j, sub_chunk in enumerate(sub_chunks)
+            )
+
+        base = {
+            "filename": filename,
+            "title": title,
+            "file_type": "markdown",
+            "semantic_split": True,
+            "total_chunks": len(pieces)
+        }
+
+        chunks = []
+        for sub_chunk, headers, j, sub_count in pieces:
+            # Lower once and reuse the split; both were full extra scans
+            sub_chunk_lower = sub_chunk.lower()
+            metadata = {
+                **base,
+                "headers": headers,
+                "sub_chunk_index": j,
+                "sub_chunk_count": sub_count,
+                "word_count": len(sub_chunk_lower.split()),
+                **self._extract_semantic_info(sub_chunk_lower)
+            }
+            chunks.append({"content": sub_chunk, "metadata": metadata})
+
+        return chunks
+
+    def _tokenize(self, text: str) -> List[int]:
+        """Tokenize text, farming paragraph blocks across cores when large"""
+        if len(text) < _PARALLEL_TOKENIZE_MIN_CHARS:
+            return _ENC.encode(text)
+
+        # Tokenization is CPU-bound and paragraphs are independent, so encode
+        # blocks concurrently and stitch them back with the separator's tokens
+        pieces = text.split("\n\n")
+        separator = _ENC.encode("\n\n")
+        with ProcessPoolExecutor() as executor:
+            encoded = list(executor.map(_encode_piece, pieces, chunksize=64))
+
+        tokens = []
+        for i, piece_tokens in enumerate(encoded):
+            if i:
+                tokens.extend(separator)
+            tokens.extend(piece_tokens)
+        return tokens
+
+    def _split_tokens(self, text: str) -> List[str]:
+        """Slice one token stream into overlapping windows
+
+        Encodes the text once instead of letting the splitter re-tokenize, and
+        emits chunks by decoding fixed-stride slices.
+        """
+        tokens = self._tokenize(text)
+        step = max(1, Config.CHUNK_SIZE - Config.CHUNK_OVERLAP)
+        chunks = []
+        for start in range(0, len(tokens), step):
+            chunks.append(_ENC.decode(tokens[start:start + Config.CHUNK_SIZE]))
+            # Once a window reaches the end of the stream, stop: another step
+            # would emit a chunk fully contained in this one
+            if start + Config.CHUNK_SIZE >= len(tokens):
+                break
+        return chunks
+
+    def _chunk_general_semantic(self, text: str, filename: str, title: str, file_type: str) -> List[Dict[str, Any]]:
+        """Split unstructured text into token-bounded chunks"""
+        texts = self._split_tokens(text)
+        base = {
+            "filename": filename,
+            "title": title,
+            "file_type": file_type,
+            "semantic_split": False,
+            "total_chunks": len(texts)
+        }
+
+        chunks = []
+        for chunk_text in texts:
+            chunk_lower = chunk_text.lower()
+            metadata = {
+                **base,
+                "word_count": len(chunk_lower.split()),
+                **self._extract_semantic_info(chunk_lower)
+            }
+            chunks.append({"content": chunk_text, "metadata": metadata})
+
+        return chunks
+
+    def _extract_semantic_info(self, text_lower: str) -> Dict[str, Any]:
+        """Classify an already-lowercased chunk and pull out key topics"""
+        # One automaton pass replaces ~20 separate substring scans
+        hits_by_category = defaultdict(set)
+        for _, (word, categories) in _KEYWORD_AUTOMATON.iter(text_lower):
+            for category in categories:
+                hits_by_category[category].add(word)
+
+        content_type = next(
+            (category for category in _CONTENT_TYPE_PRIORITY if category in hits_by_category),
+            "general"
+        )
+
+        topic_hits = hits_by_category.get("topic", ())
+        key_topics = [keyword for keyword in _TOPIC_KEYWORDS if keyword in topic_hits]
+
+        return {"content_type": content_type, "key_topics": key_topics}
@@ -1,43 +1,185 @@
+import asyncio
+import hashlib
+import diskcache
+import httpx
+import numpy as np
 import openai
+import tiktoken
+from tenacity import retry, stop_after_attempt, wait_exponential
 from typing import List, Dict, Any
 from config import Config
 
+# Shared encoder for token-aware batching (same encoding the chunker uses)
+_ENC = tiktoken.get_encoding("cl100k_base")
+
+# Retry policy for transient API failures (rate limits, 5xx)
+_retry_api = retry(wait=wait_exponential(multiplier=0.5, max=30), stop=stop_after_attempt(6), reraise=True)
+
 class EmbeddingService:
     """Service for handling OpenAI embeddings"""
-    
+
+    # Conservative per-request limits for the embeddings endpoint
+    MAX_BATCH_INPUTS = 96
+    MAX_BATCH_TOKENS = 7000
+
+    # On-disk embedding cache location
+    CACHE_DIR = "./.embed_cache"
+
     def __init__(self):
         """Initialize the embedding service"""
-        openai.api_key = Config.OPENAI_API_KEY
         self.model = Config.EMBEDDING_MODEL
-    
+        # Instance client on a persistent HTTP/2 pool so embedding calls
+        # reuse one TLS connection instead of re-handshaking
+        self._http = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+        self.client = openai.OpenAI(api_key=Config.OPENAI_API_KEY, http_client=self._http)
+        # Same pooling for the async client; HTTP/2 multiplexes concurrent
+        # batch requests over one connection
+        self._ahttp = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+        self.aclient = openai.AsyncOpenAI(api_key=Config.OPENAI_API_KEY, http_client=self._ahttp)
+        # Persistent cache so re-ingesting unchanged content never re-bills
+        # the API; embedding(model, text) is a pure function
+        self._cache = diskcache.Cache(self.CACHE_DIR)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Scale an embedding to a unit-length float32 vector
+
+        Keeping the result as an array avoids round-tripping 1536 floats
+        through boxed Python objects on the ingestion path.
+        """
+        v = np.asarray(embedding, dtype=np.float32)
+        v /= np.linalg.norm(v) + 1e-12
+        return v
+
     def get_embedding(self, text: str) -> List[float]:
         """Get embedding for a single text"""
         try:
-            response = openai.embeddings.create(
+            response = self.client.embeddings.create(
                 model=self.model,
                 input=text
             )
-            return response.data[0].embedding
+            return self._normalize(response.data[0].embedding).tolist()
         except Exception as e:
             raise Exception(f"Error getting embedding: {str(e)}")
-    
-    def get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for multiple texts in batch"""
+
+    async def aget_embedding(self, text: str) -> List[float]:
+        """Async variant of get_embedding for use in the chat hot path"""
         try:
-            response = openai.embeddings.create(
+            response = await self.aclient.embeddings.create(
                 model=self.model,
-                input=texts
+                input=text
             )
-            return [data.embedding for data in response.data]
+            return self._normalize(response.data[0].embedding).tolist()
+        except Exception as e:
+            raise Exception(f"Error getting embedding: {str(e)}")
+
+    @staticmethod
+    def _stack(embeddings: List[np.ndarray]) -> np.ndarray:
+        """Materialize per-chunk vectors into one contiguous (n, dim) matrix"""
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        matrix = np.empty((len(embeddings), len(embeddings[0])), dtype=np.float32)
+        for i, embedding in enumerate(embeddings):
+            matrix[i] = embedding
+        return matrix
+
+    def _cache_key(self, content: str) -> str:
+        """Cache key for a chunk's embedding, scoped to the current model"""
+        return hashlib.sha256((self.model + "\x00" + content).encode()).hexdigest()
+
+    @classmethod
+    def _batch_texts(cls, texts: List[str]) -> List[List[str]]:
+        """Split texts into API-safe batches bounded by input count and tokens"""
+        batches = []
+        current, current_tokens = [], 0
+
+        for text in texts:
+            n_tokens = len(_ENC.encode(text))
+            if current and (len(current) >= cls.MAX_BATCH_INPUTS or current_tokens + n_tokens > cls.MAX_BATCH_TOKENS):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += n_tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def get_embeddings_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Get embeddings for multiple texts in token-aware batches"""
+
+        @_retry_api
+        def create(batch: List[str]):
+            return self.client.embeddings.create(model=self.model, input=batch)
+
+        try:
+            embeddings = []
+            for batch in self._batch_texts(texts):
+                response = create(batch)
+                embeddings.extend(self._normalize(data.embedding) for data in response.data)
+            return embeddings
         except Exception as e:
             raise Exception(f"Error getting batch embeddings: {str(e)}")
     
-    def embed_chunks(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Add embeddings to a list of chunks"""
+    async def aembed_chunks(self, chunks: List[Dict[str, Any]], max_concurrency: int = 8):
+        """Embed chunks with concurrent batched API calls, returning SoA arrays"""
         texts = [chunk["content"] for chunk in chunks]
-        embeddings = self.get_embeddings_batch(texts)
-        
-        for i, embedding in enumerate(embeddings):
-            chunks[i]["embedding"] = embedding
-        
-        return chunks 
\ No newline at end of file
+        metadatas = [chunk["metadata"] for chunk in chunks]
+
+        # Serve unchanged chunks from the on-disk cache, embed only the misses
+        keys = [self._cache_key(text) for text in texts]
+        embeddings = [self._cache.get(key) for key in keys]
+        miss_idx = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if miss_idx:
+            batches = self._batch_texts([texts[i] for i in miss_idx])
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            @_retry_api
+            async def create(batch: List[str]):
+                return await self.aclient.embeddings.create(model=self.model, input=batch)
+
+            async def embed_batch(batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    response = await create(batch)
+                    return [self._normalize(data.embedding) for data in response.data]
+
+            try:
+                results = await asyncio.gather(*[embed_batch(batch) for batch in batches])
+            except Exception as e:
+                raise Exception(f"Error getting batch embeddings: {str(e)}")
+
+            # Splice fresh embeddings back positionally and persist them
+            fresh = [embedding for batch in results for embedding in batch]
+            for i, embedding in zip(miss_idx, fresh):
+                embeddings[i] = embedding
+                self._cache.set(keys[i], embedding)
+
+        return texts, metadatas, self._stack(embeddings)
+
+    def embed_chunks(self, chunks: List[Dict[str, Any]]):
+        """Embed chunks, returning parallel arrays instead of per-chunk dicts
+
+        Returns (texts, metadatas, embeddings) where embeddings is a single
+        contiguous float32 array of shape (n_chunks, dim).
+        """
+        texts = [chunk["content"] for chunk in chunks]
+        metadatas = [chunk["metadata"] for chunk in chunks]
+
+        keys = [self._cache_key(text) for text in texts]
+        embeddings = [self._cache.get(key) for key in keys]
+        miss_idx = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if miss_idx:
+            fresh = self.get_embeddings_batch([texts[i] for i in miss_idx])
+            for i, embedding in zip(miss_idx, fresh):
+                embeddings[i] = embedding
+                self._cache.set(keys[i], embedding)
+
+        return texts, metadatas, self._stack(embeddings) 
\ No newline at end of file
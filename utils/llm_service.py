@@ -1,11 +1,30 @@
+import hashlib
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
 from typing import List, Dict, Any
 from config import Config
 
+# Stable instruction block, kept byte-identical across calls so providers
+# with prompt caching can reuse its prefill instead of re-billing it
+SYSTEM_PROMPT = """You are Chatty, an AI assistant specializing in Australian workers' compensation law and regulations. You provide accurate, helpful information based on the provided context.
+
+Instructions:
+1. Answer the question based on the provided context
+2. If the context doesn't contain enough information to answer the question, say so clearly
+3. Provide specific, actionable information when possible
+4. Cite your sources using the numbered references [1], [2], etc.
+5. Keep your response concise but comprehensive
+6. Focus on Australian workers' compensation law and regulations"""
+
 class LLMService:
     """Service for interacting with OpenRouter LLM API"""
-    
+
+    # Exact-match answer cache size; entries evict least-recently-used
+    RESPONSE_CACHE_SIZE = 1024
+
     def __init__(self):
         """Initialize the LLM service"""
         self.api_key = Config.OPENROUTER_API_KEY
@@ -13,20 +32,64 @@ class LLMService:
         self.model = Config.LLM_MODEL
         self.temperature = Config.TEMPERATURE
         self.max_tokens = Config.MAX_TOKENS
-    
+
+        # Persistent session: keep-alive avoids a fresh TCP+TLS handshake per
+        # call, and transient failures retry with backoff
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://chatty-chatbot.streamlit.app",
+            "X-Title": "Chatty Workers' Compensation Chatbot"
+        })
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["POST"]
+            )
+        ))
+
+        # Repeat questions against unchanged context skip the LLM entirely
+        self._response_cache = OrderedDict()
+
+    def _response_cache_key(self, question: str, context_text: str) -> str:
+        """Cache key covering everything that shapes the answer"""
+        raw = f"{self.model}\x00{self.temperature}\x00{question}\x00{context_text}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
     def generate_response(self, question: str, context_chunks: List[Dict[str, Any]]) -> str:
         """Generate a response using the LLM with context"""
-        # Prepare context from chunks
-        context_text = self._prepare_context(context_chunks)
-        
-        # Create the prompt
-        prompt = self._create_prompt(question, context_text)
-        
-        # Call OpenRouter API
-        response = self._call_openrouter(prompt)
-        
-        return response
+        # Single code path: collect the stream so blocking callers share the
+        # streaming implementation instead of a duplicate request body
+        return "".join(self.stream_response(question, context_chunks)).strip()
     
+    def stream_response(self, question: str, context_chunks: List[Dict[str, Any]]):
+        """Stream a response from the LLM token by token"""
+        context_text = self._prepare_context(context_chunks)
+
+        # Hashing context_text into the key invalidates hits whenever the
+        # retrieved chunks change
+        cache_key = self._response_cache_key(question, context_text)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._response_cache.move_to_end(cache_key)
+            yield cached
+            return
+
+        messages = self._build_messages(question, context_text)
+        parts = []
+        for delta in self._stream_openrouter(messages):
+            parts.append(delta)
+            yield delta
+
+        self._response_cache[cache_key] = "".join(parts)
+        if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+
     def _prepare_context(self, chunks: List[Dict[str, Any]]) -> str:
         """Prepare context from retrieved chunks"""
         context_parts = []
@@ -35,8 +98,8 @@ class LLMService:
             metadata = chunk.get("metadata", {})
             if isinstance(metadata, str):
                 try:
-                    metadata = json.loads(metadata)
-                except:
+                    metadata = orjson.loads(metadata)
+                except orjson.JSONDecodeError:
                     metadata = {}
             
             filename = metadata.get("filename", "Unknown")
@@ -47,61 +110,54 @@ class LLMService:
         
         return "\n".join(context_parts)
     
-    def _create_prompt(self, question: str, context: str) -> str:
-        """Create the prompt for the LLM"""
-        return f"""You are Chatty, an AI assistant specializing in Australian workers' compensation law and regulations. You provide accurate, helpful information based on the provided context.
-
-Context Information:
-{context}
-
-Question: {question}
-
-Instructions:
-1. Answer the question based on the provided context
-2. If the context doesn't contain enough information to answer the question, say so clearly
-3. Provide specific, actionable information when possible
-4. Cite your sources using the numbered references [1], [2], etc.
-5. Keep your response concise but comprehensive
-6. Focus on Australian workers' compensation law and regulations
+    def _build_messages(self, question: str, context: str) -> List[Dict[str, Any]]:
+        """Build the message list: cacheable system prefix, volatile user turn"""
+        system_message = {"role": "system", "content": SYSTEM_PROMPT}
+        if self.model.startswith(("anthropic/", "deepseek/")):
+            # Explicit opt-in where the provider requires it; others prefix-cache
+            # the identical system block automatically
+            system_message["cache_control"] = {"type": "ephemeral"}
 
-Answer:"""
+        return [
+            system_message,
+            {"role": "user", "content": f"Context Information:\n{context}\n\nQuestion: {question}"}
+        ]
     
-    def _call_openrouter(self, prompt: str) -> str:
-        """Make API call to OpenRouter"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://chatty-chatbot.streamlit.app",
-            "X-Title": "Chatty Workers' Compensation Chatbot"
-        }
-        
+    def _stream_openrouter(self, messages: List[Dict[str, Any]]):
+        """Make a streaming API call to OpenRouter, yielding content deltas"""
         data = {
             "model": self.model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            "messages": messages,
             "temperature": self.temperature,
-            "max_tokens": self.max_tokens
+            "max_tokens": self.max_tokens,
+            "stream": True
         }
-        
+
         try:
-            response = requests.post(
+            # Serialize with orjson; the session already carries the
+            # application/json content type
+            with self._session.post(
                 f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            else:
-                raise Exception(f"OpenRouter API error: {response.status_code} - {response.text}")
-                
+                data=orjson.dumps(data),
+                timeout=30,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    raise Exception(f"OpenRouter API error: {response.status_code} - {response.text}")
+
+                for line in response.iter_lines():
+                    if not line.startswith(b"data: "):
+                        continue
+                    payload = line[6:]
+                    if payload == b"[DONE]":
+                        break
+                    chunk = orjson.loads(payload)
+                    delta = chunk["choices"][0]["delta"].get("content")
+                    if delta:
+                        yield delta
+
         except requests.exceptions.RequestException as e:
             raise Exception(f"Error calling OpenRouter API: {str(e)}")
         except KeyError as e:
-            raise Exception(f"Unexpected response format from OpenRouter: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Unexpected response format from OpenRouter: {str(e)}")
+